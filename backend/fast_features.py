@@ -0,0 +1,62 @@
+"""
+Numba kernels for the audio feature front-end used by server.analyze_audio_features.
+All frame-major arrays are shaped (n_frames, n_bins).
+Kernels are single-threaded: under load each analysis process in the server's pool
+occupies a core, and only the FFT (outside Numba) scales its threads to spare cores.
+Compilation happens in server.warmup_analysis.
+"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def frame_and_window(y, window, hop):
+    """
+    Slice y into overlapping frames of len(window) samples and apply the window,
+    upcasting integer PCM to float32. Callers centre-pad y by len(window) // 2
+    to match librosa's framing.
+    Returns: (n_frames, n_fft) windowed frames
+    """
+    n_fft = window.shape[0]
+    n_frames = 1 + (y.shape[0] - n_fft) // hop
+    frames = np.empty((n_frames, n_fft), dtype=np.float32)
+    for f in range(n_frames):
+        start = f * hop
+        for k in range(n_fft):
+            frames[f, k] = y[start + k] * window[k]
+    return frames
+
+
+@njit(cache=True, fastmath=True)
+def power_spectrum(X):
+    """
+    Squared magnitude of a complex spectrum.
+    Returns: (n_frames, n_bins) power spectrum
+    """
+    n_frames, n_bins = X.shape
+    P = np.empty((n_frames, n_bins), dtype=np.float32)
+    for f in range(n_frames):
+        for k in range(n_bins):
+            re = X[f, k].real
+            im = X[f, k].imag
+            P[f, k] = re * re + im * im
+    return P
+
+
+@njit(cache=True, fastmath=True)
+def std_axis0(x):
+    """
+    Population standard deviation of each column in a single Welford pass.
+    Returns: (n_cols,) standard deviations
+    """
+    n, n_cols = x.shape
+    out = np.empty(n_cols, dtype=np.float64)
+    for j in range(n_cols):
+        mean = 0.0
+        m2 = 0.0
+        for i in range(n):
+            d = x[i, j] - mean
+            mean += d / (i + 1)
+            m2 += d * (x[i, j] - mean)
+        out[j] = np.sqrt(m2 / n)
+    return out
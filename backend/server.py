@@ -1,9 +1,13 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Header, File, Form, UploadFile
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import hmac
+import asyncio
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Literal
@@ -15,7 +19,10 @@ import numpy as np
 import librosa
 import soundfile as sf
 from scipy import stats
-import tempfile
+import scipy.fft
+import scipy.signal
+from fast_features import frame_and_window, power_spectrum, std_axis0
+from pydub import AudioSegment
 
 
 ROOT_DIR = Path(__file__).parent
@@ -26,14 +33,79 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Process pool size for CPU-bound audio analysis; analysis_executor is defined below
+# warmup_analysis, which it uses as its worker initializer
+CPU_COUNT = os.cpu_count() or 1
+ANALYSIS_WORKERS = CPU_COUNT
+
+# Analyses currently running in the process pool, awaited on shutdown
+analyses_in_flight: set = set()
+
+# Analysis records awaiting a bulk insert, drained by analysis_record_writer
+pending_analyses: List[dict] = []
+flush_event = asyncio.Event()
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Valid API Key
 VALID_API_KEY = "sk_test_voice_detection_2026"
+VALID_API_KEY_BYTES = VALID_API_KEY.encode()
+
+# Audio analysis settings (16 kHz framing is sufficient for speech features)
+SAMPLE_RATE = 16000
+N_FFT = 512
+HOP_LENGTH = 160
+
+# Decoded audio is held as int16 PCM; the window folds in the 1/32768 scale back to [-1, 1)
+PCM_SCALE = 32768.0
+
+# Analysis bases depend only on the settings above, so build them once per process
+PCM_STFT_WINDOW = (scipy.signal.windows.hann(N_FFT, sym=False) / PCM_SCALE).astype(np.float32)
+FFT_FREQS = np.fft.rfftfreq(N_FFT, 1 / SAMPLE_RATE).astype(np.float32)
+
+# Default to human with low confidence if analysis fails
+DEFAULT_RESULT = ("HUMAN", 0.55, "Unable to analyze audio features completely, defaulting to human classification")
+SHORT_AUDIO_RESULT = ("HUMAN", 0.55, "Audio too short for analysis")
+
+# Input limits: payloads above MAX_AUDIO_BYTES are rejected, clips under MIN_AUDIO_SECONDS skip analysis
+MAX_AUDIO_BYTES = 10 * 1024 * 1024
+MIN_AUDIO_SECONDS = 0.5
+
+# Uploads to /voice-detection/raw must carry one of these content types or a .mp3 filename
+MP3_CONTENT_TYPES = {"audio/mpeg", "audio/mp3"}
+
+# AI indicator lookup tables, one row per feature:
+# pitch std, zero crossing rate std, spectral centroid std, RMS energy std, spectral contrast std.
+# A feature's bucket is how many of its thresholds it reaches; low variation (bucket 0) suggests AI.
+INDICATOR_THRESHOLDS = np.array([
+    [50, 100],
+    [0.02, np.inf],
+    [200, np.inf],
+    [0.02, np.inf],
+    [5, np.inf],
+])
+INDICATOR_WEIGHTS = np.array([
+    [0.8, 0.5, 0.2],
+    [0.7, 0.3, 0.3],
+    [0.75, 0.25, 0.25],
+    [0.7, 0.3, 0.3],
+    [0.65, 0.35, 0.35],
+])
+INDICATOR_EXPLANATIONS = np.array([
+    ["Unnatural pitch consistency detected", "Moderate pitch variation", "Natural pitch variation"],
+    ["Robotic speech patterns", "", ""],
+    ["Low spectral dynamics", "", ""],
+    ["Uniform energy distribution", "", ""],
+    ["Flat tonal quality", "", ""],
+])
+
+# Bulk writes: flush analysis records every FLUSH_INTERVAL seconds or once FLUSH_BATCH_SIZE are pending
+FLUSH_INTERVAL = 0.1
+FLUSH_BATCH_SIZE = 500
 
 # Define Models
 class VoiceDetectionRequest(BaseModel):
@@ -53,122 +125,202 @@ class ErrorResponse(BaseModel):
     message: str
 
 
-def analyze_audio_features(audio_data: bytes) -> tuple[str, float, str]:
+def to_pcm16(y: np.ndarray) -> np.ndarray:
+    """Quantize float samples in [-1, 1] to int16 PCM."""
+    return np.clip(np.round(y * PCM_SCALE), -32768, 32767).astype(np.int16)
+
+
+def decode_audio(audio_data: bytes, duration: float = 30) -> tuple[np.ndarray, int]:
+    """
+    Decode audio bytes in memory, resampled to SAMPLE_RATE mono.
+    Uses soundfile when it can read the stream, falling back to pydub for MP3.
+    The pydub fallback shells out to ffmpeg/ffprobe, which must be installed on the host.
+    Returns: (int16 PCM samples, sample_rate)
+    """
+    try:
+        y, sr = librosa.load(io.BytesIO(audio_data), sr=SAMPLE_RATE, duration=duration, mono=True, res_type='soxr_hq', dtype=np.float32)
+        return to_pcm16(y), sr
+    except Exception as e:
+        logging.warning(f"soundfile could not decode audio, falling back to pydub: {str(e)}")
+        segment = AudioSegment.from_file(io.BytesIO(audio_data), format="mp3")
+        segment = segment[:int(duration * 1000)].set_channels(1)
+        
+        scale = float(1 << (8 * segment.sample_width - 1))
+        y = np.asarray(segment.get_array_of_samples(), dtype=np.float32) / scale
+        y = librosa.resample(y, orig_sr=segment.frame_rate, target_sr=SAMPLE_RATE, res_type='soxr_hq')
+        return to_pcm16(y), SAMPLE_RATE
+
+
+def stft_frames(y: np.ndarray) -> np.ndarray:
+    """
+    Centre-pad and window int16 PCM into STFT frames (same framing as librosa.stft).
+    Frames are upcast to float32 only as the window is applied.
+    Returns: (n_frames, N_FFT) float32 windowed frames
+    """
+    y_padded = np.pad(y, N_FFT // 2)
+    return frame_and_window(y_padded, PCM_STFT_WINDOW, HOP_LENGTH)
+
+
+def zero_crossing_rate(y: np.ndarray) -> np.ndarray:
+    """
+    Frame-wise zero crossing rate with the same framing as librosa.feature.zero_crossing_rate
+    (edge-padded centre frames, zero samples counted as positive).
+    Returns: (n_frames,) crossing rates
+    """
+    y_padded = np.pad(y, N_FFT // 2, mode='edge')
+    signs = (y_padded < 0).view(np.uint8)
+    crossings = signs[1:] ^ signs[:-1]
+    frames = np.lib.stride_tricks.sliding_window_view(crossings, N_FFT - 1)[::HOP_LENGTH]
+    return frames.sum(axis=-1) / N_FFT
+
+
+def power_spectrogram(frames: np.ndarray, workers: int = 1) -> np.ndarray:
+    """
+    Power spectrum of windowed STFT frames via pocketfft's rfft on `workers` threads.
+    Returns: (n_frames, N_FFT // 2 + 1) float32 power spectrum
+    """
+    X = scipy.fft.rfft(frames, n=N_FFT, axis=-1, workers=workers)
+    return power_spectrum(X)
+
+
+def spectral_centroid(S: np.ndarray) -> np.ndarray:
+    """
+    Spectral centroid from a (n_bins, n_frames) magnitude spectrogram,
+    matching librosa.feature.spectral_centroid.
+    Returns: (n_frames,) centroids
+    """
+    return (FFT_FREQS @ S) / (S.sum(axis=0) + 1e-12)
+
+
+def score_indicators(scores: np.ndarray) -> tuple[np.ndarray, List[str]]:
+    """
+    Look up each feature's AI indicator weight and explanation from its threshold bucket.
+    Scores are ordered as the rows of INDICATOR_THRESHOLDS.
+    Returns: (ai_indicators, explanations)
+    """
+    # Bucket = number of thresholds the score is not below (NaN falls in the top bucket)
+    bucket = (~(scores[:, None] < INDICATOR_THRESHOLDS)).sum(axis=1)
+    rows = np.arange(len(scores))
+    return INDICATOR_WEIGHTS[rows, bucket], [e for e in INDICATOR_EXPLANATIONS[rows, bucket] if e]
+
+
+def classify_spectrogram(y: np.ndarray, sr: int, P: np.ndarray) -> tuple[str, float, str]:
+    """
+    Classify a decoded signal from its samples and (n_frames, n_bins) power spectrum.
+    Returns: (classification, confidence_score, explanation)
+    """
+    # librosa features take a (n_bins, n_frames) magnitude spectrogram
+    S = np.sqrt(P).T
+    
+    # Extract features
+    # 1. Pitch variation (AI voices tend to have less natural variation)
+    pitches, magnitudes = librosa.piptrack(S=S, sr=sr)
+    index = magnitudes.argmax(axis=0)
+    pitch_values = pitches[index, np.arange(pitches.shape[1])]
+    pitch_values = pitch_values[pitch_values > 0]
+    
+    pitch_std = np.std(pitch_values) if pitch_values.size > 0 else 0
+    
+    # 2. Zero Crossing Rate (speech naturalness)
+    zcr = zero_crossing_rate(y)
+    zcr_std = np.std(zcr)
+    
+    # 3. Spectral variation
+    spectral_centroid_std = np.std(spectral_centroid(S))
+    
+    # 4. Energy variation
+    rms = librosa.feature.rms(S=S, frame_length=N_FFT)[0]
+    rms_std = np.std(rms)
+    
+    # 5. Spectral contrast (AI voices have less dynamic contrast)
+    # 5 octave bands from 200 Hz stay below the 8 kHz Nyquist limit
+    spectral_contrast = librosa.feature.spectral_contrast(S=S, sr=sr, n_bands=5)
+    contrast_std = std_axis0(spectral_contrast.T).mean()
+    
+    # Calculate AI probability score
+    # Lower variation = higher AI probability
+    scores = np.array([pitch_std, zcr_std, spectral_centroid_std, rms_std, contrast_std])
+    ai_indicators, explanations = score_indicators(scores)
+    
+    # Calculate final confidence
+    ai_probability = np.mean(ai_indicators)
+    
+    # Determine classification
+    if ai_probability > 0.5:
+        classification = "AI_GENERATED"
+        confidence = ai_probability
+        main_explanation = ", ".join([e for e in explanations if "Natural" not in e][:2])
+    else:
+        classification = "HUMAN"
+        confidence = 1 - ai_probability
+        main_explanation = "Natural speech characteristics and human-like variations detected"
+    
+    return classification, round(confidence, 2), main_explanation
+
+
+def warmup_analysis():
+    """
+    Run the feature pipeline once on a synthetic 1-second tone so librosa's
+    numba kernels and filter caches are built before the first real request.
+    """
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    y = to_pcm16(0.1 * np.sin(2 * np.pi * 220 * t))
+    classify_spectrogram(y, SAMPLE_RATE, power_spectrogram(stft_frames(y)))
+
+
+# Process pool for CPU-bound audio analysis (keeps the event loop responsive).
+# Each worker process runs warmup_analysis as it starts, before taking any job;
+# start_analysis_pool launches the workers at startup so requests find them warm.
+analysis_executor = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, initializer=warmup_analysis)
+
+
+def analyze_audio_features(audio_data: bytes, fft_workers: int = 1) -> tuple[str, float, str]:
     """
     Analyze audio features to detect AI-generated vs human voice.
+    fft_workers sets the thread count for the STFT's FFT.
     Returns: (classification, confidence_score, explanation)
     """
     try:
-        # Create temporary file to load audio
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_path = temp_file.name
-        
-        # Load audio file
-        y, sr = librosa.load(temp_path, sr=None, duration=30)  # Load up to 30 seconds
-        
-        # Clean up temp file
-        os.unlink(temp_path)
-        
-        # Extract features
-        # 1. Pitch variation (AI voices tend to have less natural variation)
-        pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-        pitch_values = []
-        for t in range(pitches.shape[1]):
-            index = magnitudes[:, t].argmax()
-            pitch = pitches[index, t]
-            if pitch > 0:
-                pitch_values.append(pitch)
-        
-        pitch_std = np.std(pitch_values) if len(pitch_values) > 0 else 0
-        
-        # 2. Zero Crossing Rate (speech naturalness)
-        zcr = librosa.feature.zero_crossing_rate(y)[0]
-        zcr_mean = np.mean(zcr)
-        zcr_std = np.std(zcr)
+        # Decode audio in memory
+        y, sr = decode_audio(audio_data)
+        if y.size < sr * MIN_AUDIO_SECONDS:
+            return SHORT_AUDIO_RESULT
         
-        # 3. Spectral features
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
+        # Compute the power spectrum once and share it across features
+        P = power_spectrogram(stft_frames(y), workers=fft_workers)
         
-        spectral_centroid_std = np.std(spectral_centroids)
-        spectral_rolloff_std = np.std(spectral_rolloff)
-        
-        # 4. MFCCs (Mel-frequency cepstral coefficients)
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-        mfcc_std = np.mean([np.std(mfcc) for mfcc in mfccs])
-        
-        # 5. Energy variation
-        rms = librosa.feature.rms(y=y)[0]
-        rms_std = np.std(rms)
-        
-        # 6. Spectral contrast (AI voices have less dynamic contrast)
-        spectral_contrast = librosa.feature.spectral_contrast(y=y, sr=sr)
-        contrast_std = np.mean([np.std(sc) for sc in spectral_contrast])
-        
-        # Calculate AI probability score
-        # Lower variation = higher AI probability
-        ai_indicators = []
-        explanations = []
-        
-        # Pitch consistency check (AI voices are too consistent)
-        if pitch_std < 50:
-            ai_indicators.append(0.8)
-            explanations.append("Unnatural pitch consistency detected")
-        elif pitch_std < 100:
-            ai_indicators.append(0.5)
-            explanations.append("Moderate pitch variation")
-        else:
-            ai_indicators.append(0.2)
-            explanations.append("Natural pitch variation")
-        
-        # Zero crossing rate consistency
-        if zcr_std < 0.02:
-            ai_indicators.append(0.7)
-            explanations.append("Robotic speech patterns")
-        else:
-            ai_indicators.append(0.3)
-        
-        # Spectral variation
-        if spectral_centroid_std < 200:
-            ai_indicators.append(0.75)
-            explanations.append("Low spectral dynamics")
-        else:
-            ai_indicators.append(0.25)
-        
-        # Energy dynamics
-        if rms_std < 0.02:
-            ai_indicators.append(0.7)
-            explanations.append("Uniform energy distribution")
-        else:
-            ai_indicators.append(0.3)
-        
-        # Spectral contrast
-        if contrast_std < 5:
-            ai_indicators.append(0.65)
-            explanations.append("Flat tonal quality")
-        else:
-            ai_indicators.append(0.35)
-        
-        # Calculate final confidence
-        ai_probability = np.mean(ai_indicators)
-        
-        # Determine classification
-        if ai_probability > 0.5:
-            classification = "AI_GENERATED"
-            confidence = ai_probability
-            main_explanation = ", ".join([e for e in explanations if "Natural" not in e][:2])
-        else:
-            classification = "HUMAN"
-            confidence = 1 - ai_probability
-            main_explanation = "Natural speech characteristics and human-like variations detected"
-        
-        return classification, round(confidence, 2), main_explanation
+        return classify_spectrogram(y, sr, P)
         
     except Exception as e:
         logging.error(f"Audio analysis error: {str(e)}")
         # Default to human with low confidence if analysis fails
-        return "HUMAN", 0.55, "Unable to analyze audio features completely, defaulting to human classification"
+        return DEFAULT_RESULT
+
+
+async def flush_pending_analyses():
+    """Insert all pending analysis records in batches of up to FLUSH_BATCH_SIZE."""
+    while pending_analyses:
+        batch = pending_analyses[:FLUSH_BATCH_SIZE]
+        del pending_analyses[:FLUSH_BATCH_SIZE]
+        try:
+            await db.voice_analyses.insert_many(batch, ordered=False)
+        except asyncio.CancelledError:
+            # Requeue the batch so the shutdown flush can still write it
+            pending_analyses[:0] = batch
+            raise
+        except Exception as e:
+            logging.error(f"Analysis record write error: {str(e)}")
+
+
+async def analysis_record_writer():
+    """Periodically bulk-write analysis records off the request path."""
+    while True:
+        try:
+            await asyncio.wait_for(flush_event.wait(), timeout=FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        flush_event.clear()
+        await flush_pending_analyses()
 
 
 # Routes
@@ -177,6 +329,54 @@ async def root():
     return {"message": "AI Voice Detection API v1.0"}
 
 
+def validate_api_key(x_api_key: str):
+    """Raise 401 unless x_api_key matches the valid API key."""
+    if not x_api_key or not hmac.compare_digest(x_api_key.encode(), VALID_API_KEY_BYTES):
+        raise HTTPException(
+            status_code=401,
+            detail={"status": "error", "message": "Invalid API key or malformed request"}
+        )
+
+
+def audio_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail={"status": "error", "message": f"Audio exceeds maximum size of {MAX_AUDIO_BYTES // (1024 * 1024)} MB"}
+    )
+
+
+async def run_voice_detection(language: str, audio_data: bytes) -> VoiceDetectionResponse:
+    """Analyze decoded audio in the process pool and queue the analysis record."""
+    # Analyze audio, giving the FFT the cores not claimed by other in-flight analyses
+    fft_workers = max(1, CPU_COUNT // (len(analyses_in_flight) + 1))
+    future = asyncio.get_running_loop().run_in_executor(
+        analysis_executor, analyze_audio_features, audio_data, fft_workers
+    )
+    analyses_in_flight.add(future)
+    future.add_done_callback(analyses_in_flight.discard)
+    classification, confidence, explanation = await future
+    
+    # Store analysis in database (optional)
+    analysis_record = {
+        "id": str(uuid.uuid4()),
+        "language": language,
+        "classification": classification,
+        "confidence": confidence,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+    pending_analyses.append(analysis_record)
+    if len(pending_analyses) >= FLUSH_BATCH_SIZE:
+        flush_event.set()
+    
+    return VoiceDetectionResponse(
+        status="success",
+        language=language,
+        classification=classification,
+        confidenceScore=confidence,
+        explanation=explanation
+    )
+
+
 @api_router.post("/voice-detection", response_model=VoiceDetectionResponse)
 async def detect_voice(
     request: VoiceDetectionRequest,
@@ -187,11 +387,7 @@ async def detect_voice(
     Requires valid API key in x-api-key header.
     """
     # Validate API key
-    if not x_api_key or x_api_key != VALID_API_KEY:
-        raise HTTPException(
-            status_code=401,
-            detail={"status": "error", "message": "Invalid API key or malformed request"}
-        )
+    validate_api_key(x_api_key)
     
     # Validate language
     valid_languages = ["Tamil", "English", "Hindi", "Malayalam", "Telugu"]
@@ -208,30 +404,15 @@ async def detect_voice(
             detail={"status": "error", "message": "Only MP3 format is supported"}
         )
     
+    # Reject oversized payloads before decoding (base64 inflates size by 4/3)
+    if len(request.audioBase64) * 3 // 4 > MAX_AUDIO_BYTES:
+        raise audio_too_large()
+    
     try:
         # Decode base64 audio
         audio_data = base64.b64decode(request.audioBase64)
         
-        # Analyze audio
-        classification, confidence, explanation = analyze_audio_features(audio_data)
-        
-        # Store analysis in database (optional)
-        analysis_record = {
-            "id": str(uuid.uuid4()),
-            "language": request.language,
-            "classification": classification,
-            "confidence": confidence,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-        await db.voice_analyses.insert_one(analysis_record)
-        
-        return VoiceDetectionResponse(
-            status="success",
-            language=request.language,
-            classification=classification,
-            confidenceScore=confidence,
-            explanation=explanation
-        )
+        return await run_voice_detection(request.language, audio_data)
         
     except base64.binascii.Error:
         raise HTTPException(
@@ -246,6 +427,44 @@ async def detect_voice(
         )
 
 
+@api_router.post("/voice-detection/raw", response_model=VoiceDetectionResponse)
+async def detect_voice_raw(
+    language: Literal["Tamil", "English", "Hindi", "Malayalam", "Telugu"] = Form(...),
+    file: UploadFile = File(...),
+    x_api_key: str = Header(None, alias="x-api-key")
+):
+    """
+    Detect if an uploaded MP3 file is AI-generated or human.
+    Accepts multipart form data so the audio skips base64 encoding entirely.
+    Requires valid API key in x-api-key header.
+    """
+    # Validate API key
+    validate_api_key(x_api_key)
+    
+    # Validate audio format
+    filename = (file.filename or "").lower()
+    if file.content_type not in MP3_CONTENT_TYPES and not filename.endswith(".mp3"):
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "error", "message": "Only MP3 format is supported"}
+        )
+    
+    # Read at most one byte past the limit to detect oversized uploads
+    audio_data = await file.read(MAX_AUDIO_BYTES + 1)
+    if len(audio_data) > MAX_AUDIO_BYTES:
+        raise audio_too_large()
+    
+    try:
+        return await run_voice_detection(language, audio_data)
+        
+    except Exception as e:
+        logging.error(f"Voice detection error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "error", "message": f"Internal server error: {str(e)}"}
+        )
+
+
 @api_router.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "voice-detection-api"}
@@ -269,6 +488,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_analysis_pool():
+    # ProcessPoolExecutor only launches workers on submit (all of them at once under
+    # fork); a no-op job returns once a worker has finished warmup_analysis
+    await asyncio.get_running_loop().run_in_executor(analysis_executor, int)
+
+@app.on_event("startup")
+async def start_analysis_record_writer():
+    app.state.record_writer = asyncio.create_task(analysis_record_writer())
+
+# Shutdown hooks run in registration order: stop analysis first so no records
+# are queued after the final flush, then drain the record writer and close Mongo
+@app.on_event("shutdown")
+async def shutdown_analysis_executor():
+    await asyncio.gather(*analyses_in_flight, return_exceptions=True)
+    analysis_executor.shutdown(wait=False)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.record_writer.cancel()
+    try:
+        await app.state.record_writer
+    except asyncio.CancelledError:
+        pass
+    await flush_pending_analyses()
     client.close()
\ No newline at end of file
@@ -13,7 +13,7 @@ class VoiceDetectionAPITester:
         self.tests_passed = 0
         self.languages = ["Tamil", "English", "Hindi", "Malayalam", "Telugu"]
         
-    def run_test(self, name, method, endpoint, expected_status, data=None, headers=None):
+    def run_test(self, name, method, endpoint, expected_status, data=None, headers=None, files=None):
         """Run a single API test"""
         url = f"{self.base_url}/{endpoint}"
         self.tests_run += 1
@@ -22,6 +22,8 @@ class VoiceDetectionAPITester:
         try:
             if method == 'GET':
                 response = requests.get(url, headers=headers)
+            elif method == 'POST' and files:
+                response = requests.post(url, data=data, files=files, headers=headers)
             elif method == 'POST':
                 response = requests.post(url, json=data, headers=headers)
             
@@ -50,6 +52,10 @@ class VoiceDetectionAPITester:
         mp3_header = b'\xff\xfb\x90\x00' + b'\x00' * 100  # Simplified MP3 header
         return base64.b64encode(mp3_header).decode('utf-8')
     
+    def create_dummy_mp3_bytes(self):
+        """Create dummy MP3-like bytes for multipart upload tests"""
+        return base64.b64decode(self.create_dummy_mp3_base64())
+    
     def test_api_root(self):
         """Test API root endpoint"""
         return self.run_test("API Root", "GET", "", 200)
@@ -209,6 +215,79 @@ class VoiceDetectionAPITester:
             data=data,
             headers=headers
         )
+    
+    def test_audio_too_large(self):
+        """Test voice detection with a payload over the 10 MB limit"""
+        data = {
+            "language": "English",
+            "audioFormat": "mp3",
+            "audioBase64": "A" * 14_000_000  # Decodes to ~10.5 MB
+        }
+        headers = {"x-api-key": self.valid_api_key, "Content-Type": "application/json"}
+        return self.run_test(
+            "Audio Too Large",
+            "POST",
+            "voice-detection",
+            413,
+            data=data,
+            headers=headers
+        )
+    
+    def test_raw_voice_detection_valid_request(self):
+        """Test raw upload voice detection with valid API key and MP3 file"""
+        files = {"file": ("sample.mp3", self.create_dummy_mp3_bytes(), "audio/mpeg")}
+        headers = {"x-api-key": self.valid_api_key}
+        return self.run_test(
+            "Raw Voice Detection - Valid Request",
+            "POST",
+            "voice-detection/raw",
+            200,
+            data={"language": "English"},
+            headers=headers,
+            files=files
+        )
+    
+    def test_raw_invalid_api_key(self):
+        """Test raw upload voice detection with invalid API key"""
+        files = {"file": ("sample.mp3", self.create_dummy_mp3_bytes(), "audio/mpeg")}
+        headers = {"x-api-key": "invalid_key_123"}
+        return self.run_test(
+            "Raw Voice Detection - Invalid API Key",
+            "POST",
+            "voice-detection/raw",
+            401,
+            data={"language": "English"},
+            headers=headers,
+            files=files
+        )
+    
+    def test_raw_invalid_audio_format(self):
+        """Test raw upload voice detection with a non-MP3 file"""
+        files = {"file": ("sample.wav", self.create_dummy_mp3_bytes(), "audio/wav")}
+        headers = {"x-api-key": self.valid_api_key}
+        return self.run_test(
+            "Raw Invalid Audio Format",
+            "POST",
+            "voice-detection/raw",
+            400,
+            data={"language": "English"},
+            headers=headers,
+            files=files
+        )
+    
+    def test_raw_audio_too_large(self):
+        """Test raw upload voice detection with a file over the 10 MB limit"""
+        files = {"file": ("sample.mp3", b"\x00" * (10 * 1024 * 1024 + 1), "audio/mpeg")}
+        headers = {"x-api-key": self.valid_api_key}
+        return self.run_test(
+            "Raw Audio Too Large",
+            "POST",
+            "voice-detection/raw",
+            413,
+            data={"language": "English"},
+            headers=headers,
+            files=files
+        )
 
 def main():
     """Run all API tests"""
@@ -235,6 +314,13 @@ def main():
     tester.test_invalid_language()
     tester.test_invalid_audio_format()
     tester.test_invalid_base64()
+    tester.test_audio_too_large()
+    
+    # Test raw upload endpoint
+    tester.test_raw_voice_detection_valid_request()
+    tester.test_raw_invalid_api_key()
+    tester.test_raw_invalid_audio_format()
+    tester.test_raw_audio_too_large()
     
     # Print final results
     print("\n" + "=" * 50)
@@ -0,0 +1,23 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# server.py reads these at import; the Motor client connects lazily, so no database is needed
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+
+SERVER_DEPENDENCIES = ["numpy", "scipy", "librosa", "numba", "fastapi", "motor", "dotenv", "pydub", "soundfile"]
+
+
+@pytest.fixture(scope="session")
+def server():
+    """Import backend/server.py, skipping when its dependencies are not installed."""
+    for module in SERVER_DEPENDENCIES:
+        pytest.importorskip(module)
+    import server
+    return server
@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def signal(server):
+    """Two seconds of int16 PCM: a noisy 220 Hz tone with a run of exact zeros and a silent tail."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    t = np.arange(2 * server.SAMPLE_RATE) / server.SAMPLE_RATE
+    y = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(t.size)
+    y[8000:9000] = 0.0
+    y[-2000:] = 0.0
+    return server.to_pcm16(y)
+
+
+def test_zero_crossing_rate_matches_librosa(server, signal):
+    import numpy as np
+    import librosa
+
+    expected = librosa.feature.zero_crossing_rate(
+        signal / server.PCM_SCALE, frame_length=server.N_FFT, hop_length=server.HOP_LENGTH
+    )[0]
+
+    np.testing.assert_allclose(server.zero_crossing_rate(signal), expected)
+
+
+def test_power_spectrogram_matches_librosa_stft(server, signal):
+    import numpy as np
+    import librosa
+
+    P = server.power_spectrogram(server.stft_frames(signal))
+    expected = np.abs(librosa.stft(signal / server.PCM_SCALE, n_fft=server.N_FFT, hop_length=server.HOP_LENGTH))
+
+    np.testing.assert_allclose(np.sqrt(P).T, expected, rtol=1e-4, atol=1e-6)
+
+
+def test_spectral_centroid_matches_librosa(server, signal):
+    import numpy as np
+    import librosa
+
+    S = np.sqrt(server.power_spectrogram(server.stft_frames(signal))).T
+    expected = librosa.feature.spectral_centroid(S=S, sr=server.SAMPLE_RATE, n_fft=server.N_FFT)[0]
+
+    np.testing.assert_allclose(server.spectral_centroid(S), expected, rtol=1e-4, atol=1e-3)
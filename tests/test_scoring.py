@@ -0,0 +1,82 @@
+import math
+
+import pytest
+
+# Neutral (human-like) value for each feature, in INDICATOR_THRESHOLDS row order
+BASELINE = [150.0, 0.05, 300.0, 0.05, 10.0]
+THRESHOLDS = [(0, 50.0), (0, 100.0), (1, 0.02), (2, 200.0), (3, 0.02), (4, 5.0)]
+NAN = float("nan")
+
+
+def legacy_indicators(pitch_std, zcr_std, spectral_centroid_std, rms_std, contrast_std):
+    """The if/elif scoring chain the lookup tables replaced."""
+    ai_indicators = []
+    explanations = []
+
+    if pitch_std < 50:
+        ai_indicators.append(0.8)
+        explanations.append("Unnatural pitch consistency detected")
+    elif pitch_std < 100:
+        ai_indicators.append(0.5)
+        explanations.append("Moderate pitch variation")
+    else:
+        ai_indicators.append(0.2)
+        explanations.append("Natural pitch variation")
+
+    if zcr_std < 0.02:
+        ai_indicators.append(0.7)
+        explanations.append("Robotic speech patterns")
+    else:
+        ai_indicators.append(0.3)
+
+    if spectral_centroid_std < 200:
+        ai_indicators.append(0.75)
+        explanations.append("Low spectral dynamics")
+    else:
+        ai_indicators.append(0.25)
+
+    if rms_std < 0.02:
+        ai_indicators.append(0.7)
+        explanations.append("Uniform energy distribution")
+    else:
+        ai_indicators.append(0.3)
+
+    if contrast_std < 5:
+        ai_indicators.append(0.65)
+        explanations.append("Flat tonal quality")
+    else:
+        ai_indicators.append(0.35)
+
+    return ai_indicators, explanations
+
+
+def score_cases():
+    cases = [BASELINE, [NAN] * 5, [0.0] * 5]
+    for row, threshold in THRESHOLDS:
+        step = threshold * 1e-6
+        for value in (threshold - step, threshold, threshold + step, NAN):
+            scores = list(BASELINE)
+            scores[row] = value
+            cases.append(scores)
+    return cases
+
+
+@pytest.mark.parametrize("scores", score_cases(), ids=lambda s: ",".join(f"{v:g}" for v in s))
+def test_score_indicators_matches_legacy_chain(server, scores):
+    import numpy as np
+
+    ai_indicators, explanations = server.score_indicators(np.array(scores))
+    expected_indicators, expected_explanations = legacy_indicators(*scores)
+
+    assert list(ai_indicators) == pytest.approx(expected_indicators)
+    assert explanations == expected_explanations
+
+
+def test_nan_scores_fall_in_top_bucket(server):
+    import numpy as np
+
+    ai_indicators, explanations = server.score_indicators(np.array([NAN] * 5))
+
+    assert list(ai_indicators) == pytest.approx([0.2, 0.3, 0.25, 0.3, 0.35])
+    assert explanations == ["Natural pitch variation"]
+    assert not any(math.isnan(v) for v in ai_indicators)